@@ -3,12 +3,17 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
+from selenium.common.exceptions import (
+    SessionNotCreatedException, StaleElementReferenceException, TimeoutException,
+    WebDriverException
+)
 from webdriver_manager.chrome import ChromeDriverManager
-from PIL import Image, ImageEnhance
-import pytesseract
 import time
 import os
-import re
+import json
+import hashlib
+import socket
+from collections import OrderedDict
 
 # Import config
 try:
@@ -18,219 +23,484 @@ try:
     SELECTOR_TYPE = config.SELECTOR_TYPE
     MAX_CLICKS = config.MAX_CLICKS
     WAIT_TIME = config.WAIT_TIME
-    TESSERACT_PATH = config.TESSERACT_PATH
     OUTPUT_FOLDER = config.OUTPUT_FOLDER
     OCR_RESULTS_FILE = config.OCR_RESULTS_FILE
+    CHROME_PROFILE = getattr(
+        config, 'CHROME_PROFILE',
+        os.path.join(os.path.expanduser('~'), '.apclassroom_chrome_profile')
+    )
+    HEADLESS = getattr(config, 'HEADLESS', False)
+    BLOCK_IMAGES = getattr(config, 'BLOCK_IMAGES', True)
+    REUSE_BROWSER = getattr(config, 'REUSE_BROWSER', False)
 except ImportError:
     print("❌ config.py not found! Run setup.py first.")
     exit(1)
 
+# Set APC_DEBUG=1 to print per-question extraction details
+DEBUG = bool(os.environ.get('APC_DEBUG'))
+# Set APC_VERBOSE=1 for step-by-step progress instead of one line per question
+VERBOSE = bool(os.environ.get('APC_VERBOSE'))
+
+# In-page extractor for the currently visible Learnosity question.
+# Installed once per document as window.__extractQuestionData.
+EXTRACT_QUESTION_JS = """
+    function extractCurrentQuestionData(debug) {
+        let result = {question: '', answers: [], debug: {}};
+
+        // DIRECT APPROACH: Find the currently visible question container
+        const containerSelectors = ['.learnosity-item', '[class*="question"]', '.lrn-assessment-wrapper', '.lrn_assessment'];
+        const apc = window.__apc || (window.__apc = {containerSelector: null});
+        let allQuestionContainers = null;
+        let activeContainer = null;
+
+        function isActiveContainer(container) {
+            // Cheap check first: container should have question content.
+            // Style/layout reads below are only paid for real candidates.
+            const hasStimulus = container.querySelector('.lrn_stimulus_content');
+            const hasRadioInputs = container.querySelector('input[type="radio"]');
+            if (!hasStimulus && !hasRadioInputs) {
+                return false;
+            }
+
+            const style = window.getComputedStyle(container);
+            const rect = container.getBoundingClientRect();
+
+            // Check if container is actually visible and has substantial size
+            const isVisible = style.display !== 'none' && 
+                             style.visibility !== 'hidden' && 
+                             style.opacity !== '0' &&
+                             rect.width > 100 && 
+                             rect.height > 100 &&
+                             rect.top >= 0 &&
+                             rect.top < window.innerHeight;
+
+            if (debug) {
+                console.log("Container check:", {
+                    display: style.display,
+                    visibility: style.visibility,
+                    opacity: style.opacity,
+                    width: rect.width,
+                    height: rect.height,
+                    top: rect.top,
+                    isVisible: isVisible
+                });
+            }
+
+            return isVisible;
+        }
+
+        // Try the selector that matched last time before the full scan
+        if (apc.containerSelector) {
+            for (let container of document.querySelectorAll(apc.containerSelector)) {
+                if (isActiveContainer(container)) {
+                    activeContainer = container;
+                    break;
+                }
+            }
+        }
+
+        if (!activeContainer) {
+            allQuestionContainers = document.querySelectorAll(containerSelectors.join(', '));
+            for (let container of allQuestionContainers) {
+                if (isActiveContainer(container)) {
+                    activeContainer = container;
+                    break;
+                }
+            }
+            apc.containerSelector = activeContainer ?
+                containerSelectors.find(sel => activeContainer.matches(sel)) : null;
+        }
+
+        result.debug.containerFound = !!activeContainer;
+        result.debug.containerSelector = apc.containerSelector;
+        result.debug.totalContainers = allQuestionContainers ? allQuestionContainers.length : 0;
+
+        if (activeContainer) {
+            // Extract question text
+            const stimulusContent = activeContainer.querySelector('.lrn_stimulus_content');
+
+            if (stimulusContent) {
+                const paragraphs = stimulusContent.querySelectorAll('p');
+
+                for (let p of paragraphs) {
+                    const text = p.innerText || p.textContent || '';
+                    if (text.trim().length > 20) {
+                        if (text.includes('?') || text.includes('following')) {
+                            result.question = text.trim();
+                            break;
+                        } else if (!result.question) {
+                            result.question = text.trim();
+                        }
+                    }
+                }
+
+                // Fallback: get any text from stimulus
+                if (!result.question) {
+                    result.question = stimulusContent.innerText || stimulusContent.textContent || '';
+                    result.question = result.question.trim().substring(0, 200); // Limit length
+                }
+
+                result.debug.foundStimulus = true;
+                result.debug.paragraphCount = paragraphs.length;
+            }
+
+            // Extract answers from this container only
+            const radioInputs = activeContainer.querySelectorAll('input[type="radio"]');
+            result.debug.foundInputs = radioInputs.length;
+
+            const seenAnswers = new Set();
+
+            for (let input of radioInputs) {
+                // input.labels is resolved by the browser; avoids a document-wide
+                // attribute-selector scan per answer
+                const label = (input.labels && input.labels[0]) ||
+                              document.querySelector(`label[for="${input.id}"]`);
+
+                if (label) {
+                    const possibleAnswer = label.querySelector('.lrn-possible-answer');
+
+                    if (possibleAnswer) {
+                        const contentWrappers = possibleAnswer.querySelectorAll('.lrn_contentWrapper');
+
+                        for (let wrapper of contentWrappers) {
+                            if (wrapper.closest('.sr-only')) {
+                                continue;
+                            }
+
+                            const p = wrapper.querySelector('p');
+                            if (p) {
+                                const text = (p.innerText || p.textContent || '').trim();
+
+                                if (text.length > 2 && !seenAnswers.has(text) && !/^[A-E]$/.test(text)) {
+                                    seenAnswers.add(text);
+                                    result.answers.push({
+                                        letter: 'ABCDE'[result.answers.length],
+                                        text: text
+                                    });
+                                    break;
+                                }
+                            }
+                        }
+                    }
+                }
+
+                if (result.answers.length === 5) {
+                    break;
+                }
+            }
+
+            result.debug.answerCount = result.answers.length;
+            result.debug.questionLength = result.question.length;
+
+            // Try to find question number
+            const questionNumElement = activeContainer.querySelector('.item-number');
+            if (questionNumElement) {
+                const numText = questionNumElement.innerText.trim();
+                if (numText && !isNaN(numText)) {
+                    result.debug.currentQuestion = parseInt(numText);
+                }
+            }
+        } else {
+            result.debug.error = "No active container found";
+        }
+
+        // Validate here so Python only has to check one flag
+        if (result.question.length < 10) {
+            result.reason = "Question too short or missing";
+        } else if (result.answers.length < 2) {
+            result.reason = `Need at least 2 answers (found ${result.answers.length})`;
+        }
+        result.ok = !result.reason;
+
+        // Debug: log all containers for analysis
+        if (debug && !activeContainer) {
+            result.debug.allContainers = Array.from(allQuestionContainers).map(container => {
+                const style = window.getComputedStyle(container);
+                const rect = container.getBoundingClientRect();
+                return {
+                    classes: container.className,
+                    display: style.display,
+                    visibility: style.visibility,
+                    opacity: style.opacity,
+                    size: `${rect.width}x${rect.height}`,
+                    position: `top: ${rect.top}`,
+                    hasStimulus: !!container.querySelector('.lrn_stimulus_content'),
+                    hasRadio: !!container.querySelector('input[type="radio"]')
+                };
+            });
+        }
+
+        return result;
+    }
+"""
+
+# Config SELECTOR_TYPE -> Selenium locator strategy
+SELECTOR_MAP = {
+    'css': By.CSS_SELECTOR,
+    'xpath': By.XPATH,
+    'id': By.ID,
+    'class': By.CLASS_NAME,
+    'name': By.NAME,
+}
+
+DRIVER_CACHE_FILE = os.path.join(os.path.expanduser('~'), '.cache', 'apclassroom', 'driver.json')
+DRIVER_CACHE_TTL = 7 * 24 * 3600
+_driver_path = None  # resolved once per process
+
+def _get_driver_path(refresh=False):
+    """Return the ChromeDriver path, re-resolving it at most once a week"""
+    # An explicitly pinned driver skips webdriver-manager entirely
+    pinned = os.environ.get('CHROMEDRIVER_PATH')
+    if pinned and not refresh:
+        if os.path.exists(pinned):
+            return pinned
+        print(f"⚠ CHROMEDRIVER_PATH not found: {pinned} - using webdriver-manager")
+    
+    global _driver_path
+    if _driver_path and not refresh:
+        return _driver_path
+    
+    try:
+        if not refresh and time.time() - os.path.getmtime(DRIVER_CACHE_FILE) < DRIVER_CACHE_TTL:
+            with open(DRIVER_CACHE_FILE, encoding='utf-8') as f:
+                path = json.load(f)['path']
+            if os.path.exists(path):
+                _driver_path = path
+                return path
+    except (OSError, ValueError, KeyError):
+        pass
+    
+    # Cache miss: ask webdriver-manager (network check) and remember the result
+    os.environ.setdefault('WDM_LOG_LEVEL', '0')
+    path = ChromeDriverManager().install()
+    try:
+        os.makedirs(os.path.dirname(DRIVER_CACHE_FILE), exist_ok=True)
+        with open(DRIVER_CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump({'path': path}, f)
+    except OSError:
+        pass
+    _driver_path = path
+    return path
+
+# WebDriverWait polls every 0.5 s by default; page waits react faster at 0.1 s
+POLL_INTERVAL = 0.1
+
+# Extra seconds to keep waiting once WAIT_TIME passes without a re-render
+SLOW_RENDER_TIMEOUT = 30
+
+def _profile_browser_address(profile_dir):
+    """Return the debugger address of a Chrome still running on profile_dir
+    
+    Chrome writes the port it picked to DevToolsActivePort inside its
+    profile, so only a browser started on this profile is attached to.
+    """
+    try:
+        with open(os.path.join(profile_dir, 'DevToolsActivePort'), encoding='utf-8') as f:
+            port = int(f.readline())
+    except (OSError, ValueError):
+        return None
+    
+    # The file outlives a crashed browser, so check something is listening
+    try:
+        with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+            return f'127.0.0.1:{port}'
+    except OSError:
+        return None
+
 class APClassroomOCR:
-    def __init__(self, tesseract_path=None):
+    def __init__(self, results_file=None, profile_dir=None, headless=False,
+                 block_images=True, reuse_browser=False):
         """Initialize with settings optimized for text extraction"""
         
-        # Set up Tesseract
-        if tesseract_path:
-            pytesseract.pytesseract.tesseract_cmd = tesseract_path
-        elif os.name == 'nt':
-            default_path = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
-            if os.path.exists(default_path):
-                pytesseract.pytesseract.tesseract_cmd = default_path
+        # Results are streamed to disk as they arrive; the file is only
+        # opened (and the previous run's results replaced) on the first one
+        self.results_file = results_file
+        self._results_fh = None
         
         # Chrome options
         options = webdriver.ChromeOptions()
-        options.add_argument('--start-maximized')
-        options.add_argument('--force-device-scale-factor=1.5')
+        
+        # Headless skips on-screen compositing; needs a saved login
+        if headless:
+            options.add_argument('--headless=new')
+            options.add_argument('--disable-gpu')
+            options.add_argument('--disable-extensions')
+            options.add_argument('--disable-dev-shm-usage')
+            options.add_argument('--window-size=1920,1080')
+            options.add_argument('--hide-scrollbars')
+        else:
+            # Upscaling only helps a human watching the window
+            options.add_argument('--start-maximized')
+            options.add_argument('--force-device-scale-factor=1.5')
+        
+        # Extraction only reads text, so skip downloading images.
+        # Always written (1 = allow) since the saved profile remembers it.
+        options.add_experimental_option('prefs', {
+            'profile.managed_default_content_settings.images': 2 if block_images else 1,
+            'profile.default_content_setting_values.notifications': 2,
+        })
+        # No "controlled by automated software" infobar taking up the viewport
+        options.add_experimental_option('excludeSwitches', ['enable-automation'])
+        if block_images:
+            # Renderer-level switch too, independent of the profile setting
+            options.add_argument('--blink-settings=imagesEnabled=false')
+        
+        # Persistent profile keeps the login cookies between runs
+        if profile_dir:
+            options.add_argument(f'--user-data-dir={profile_dir}')
+            options.add_argument('--profile-directory=Default')
+        
+        # Keep one Chrome alive across runs: attach if a previous run left
+        # it open on this profile, otherwise start one that outlives this
+        # script. Without a profile there is no way to find it again.
+        self.reuse_browser = reuse_browser and bool(profile_dir)
+        address = _profile_browser_address(profile_dir) if self.reuse_browser else None
+        if address:
+            options = webdriver.ChromeOptions()
+            options.add_experimental_option('debuggerAddress', address)
+        elif self.reuse_browser:
+            # Port 0 lets Chrome pick a free one and record it in the profile
+            options.add_argument('--remote-debugging-port=0')
+            options.add_experimental_option('detach', True)
+        
+        # driver.get returns at DOMContentLoaded; the waits below key on
+        # the question content instead of every tracker and font
+        options.page_load_strategy = 'eager'
         
         # Initialize driver
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=options)
+        driver_path = _get_driver_path()
+        try:
+            self.driver = webdriver.Chrome(service=Service(driver_path), options=options)
+        except SessionNotCreatedException as e:
+            # Only a cached driver that no longer matches Chrome (browser
+            # updated) is fixed by re-resolving; anything else, such as the
+            # profile being in use, would just fail again
+            if ('only supports Chrome version' not in str(e)
+                    or driver_path == os.environ.get('CHROMEDRIVER_PATH')):
+                raise
+            service = Service(_get_driver_path(refresh=True))
+            self.driver = webdriver.Chrome(service=service, options=options)
         self.driver.set_window_size(1920, 1080)
         
-        self.ocr_results = []
+        # Also drop media that the image setting does not cover
+        if block_images:
+            try:
+                self.driver.execute_cdp_cmd('Network.enable', {})
+                self.driver.execute_cdp_cmd('Network.setBlockedURLs', {
+                    'urls': ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.svg', '*.mp4', '*.webm']
+                })
+            except Exception:
+                pass
+        
+        # Install the extractor in every new document so each call is tiny
+        try:
+            self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
+                'source': f'window.__extractQuestionData = {EXTRACT_QUESTION_JS};'
+            })
+        except Exception:
+            pass
+        
+        # Async readiness checks run in-page; allow them their own deadline
+        self.driver.set_script_timeout(20)
+        
+        # Next button locator and wait are resolved once, not per click
+        self._next_locator = (SELECTOR_MAP.get(SELECTOR_TYPE, By.CSS_SELECTOR), BUTTON_SELECTOR)
+        self._next_wait = WebDriverWait(self.driver, 5, poll_frequency=POLL_INTERVAL)
+        self.last_error = None
+        
+        # Only question numbers are kept in memory for the summary
+        self.successful = []
+        self.failed = []
+        self._recent_hashes = OrderedDict()  # digest -> question it was saved under
+        self._last_hash = None  # digest of the question read just before
     
     def navigate_to_url(self, url):
         """Navigate to website"""
         self.driver.get(url)
-        time.sleep(3)
-    
-    def wait_for_load(self):
-        """Wait for page to fully load"""
-        WebDriverWait(self.driver, 10).until(
-            lambda d: d.execute_script("return document.readyState") == "complete"
+        WebDriverWait(self.driver, 10, poll_frequency=POLL_INTERVAL).until(
+            lambda d: d.execute_script("return document.readyState") != "loading"
         )
-        time.sleep(1.5)
     
-    def extract_question_and_answers(self):
-        """
-        Extract ONLY the currently visible question and answers
+    def is_logged_in(self, timeout=5):
+        """Check whether a question is already showing (saved session)"""
+        try:
+            WebDriverWait(self.driver, timeout, poll_frequency=POLL_INTERVAL).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, '.lrn_stimulus_content'))
+            )
+            return True
+        except TimeoutException:
+            return False
+    
+    def wait_for_load(self, timeout=10, quiet_ms=150, quiet_timeout=2):
+        """Wait for page load, question content and a quiet network
+        
+        All three checks poll inside the page in one async call instead of
+        one WebDriver round-trip per poll. Returns False on timeout.
         """
         try:
-            # Wait for content to load
-            time.sleep(2)
-            
-            script = """
-            function extractCurrentQuestionData() {
-                let result = {question: '', answers: [], debug: {}};
-                
-                // DIRECT APPROACH: Find the currently visible question container
-                const allQuestionContainers = document.querySelectorAll('.learnosity-item, [class*="question"], .lrn-assessment-wrapper, .lrn_assessment');
-                let activeContainer = null;
-                
-                console.log("Total containers found:", allQuestionContainers.length);
-                
-                for (let container of allQuestionContainers) {
-                    const style = window.getComputedStyle(container);
-                    const rect = container.getBoundingClientRect();
-                    
-                    // Check if container is actually visible and has substantial size
-                    const isVisible = style.display !== 'none' && 
-                                     style.visibility !== 'hidden' && 
-                                     style.opacity !== '0' &&
-                                     rect.width > 100 && 
-                                     rect.height > 100 &&
-                                     rect.top >= 0 &&
-                                     rect.top < window.innerHeight;
-                    
-                    console.log("Container check:", {
-                        display: style.display,
-                        visibility: style.visibility,
-                        opacity: style.opacity,
-                        width: rect.width,
-                        height: rect.height,
-                        top: rect.top,
-                        isVisible: isVisible
-                    });
-                    
-                    if (isVisible) {
-                        // Additional check: container should have question content
-                        const hasStimulus = container.querySelector('.lrn_stimulus_content');
-                        const hasRadioInputs = container.querySelector('input[type="radio"]');
-                        
-                        if (hasStimulus || hasRadioInputs) {
-                            activeContainer = container;
-                            console.log("Found active container!");
-                            break;
-                        }
+            return self.driver.execute_async_script("""
+                const [timeout, quietMs, quietTimeout, done] = arguments;
+                const start = performance.now();
+                let contentAt = null;
+                (function check() {
+                    const now = performance.now();
+                    if (contentAt === null && document.readyState !== 'loading' &&
+                            document.querySelector('.lrn_stimulus_content, input[type="radio"]')) {
+                        contentAt = now;
                     }
-                }
-                
-                result.debug.containerFound = !!activeContainer;
-                result.debug.totalContainers = allQuestionContainers.length;
-                
-                if (activeContainer) {
-                    // Extract question text
-                    const stimulusContent = activeContainer.querySelector('.lrn_stimulus_content');
-                    
-                    if (stimulusContent) {
-                        const paragraphs = stimulusContent.querySelectorAll('p');
-                        
-                        for (let p of paragraphs) {
-                            const text = p.innerText || p.textContent || '';
-                            if (text.trim().length > 20) {
-                                if (text.includes('?') || text.includes('following')) {
-                                    result.question = text.trim();
-                                    break;
-                                } else if (!result.question) {
-                                    result.question = text.trim();
-                                }
-                            }
+                    if (contentAt !== null) {
+                        // Let Learnosity finish fetching the item's assets
+                        let last = 0;
+                        for (const entry of performance.getEntriesByType('resource')) {
+                            last = Math.max(last, entry.responseEnd);
                         }
-                        
-                        // Fallback: get any text from stimulus
-                        if (!result.question) {
-                            result.question = stimulusContent.innerText || stimulusContent.textContent || '';
-                            result.question = result.question.trim().substring(0, 200); // Limit length
+                        if (now - last >= quietMs || now - contentAt >= quietTimeout * 1000) {
+                            return done(true);
                         }
-                        
-                        result.debug.foundStimulus = true;
-                        result.debug.paragraphCount = paragraphs.length;
                     }
-                    
-                    // Extract answers from this container only
-                    const radioInputs = activeContainer.querySelectorAll('input[type="radio"]');
-                    result.debug.foundInputs = radioInputs.length;
-                    
-                    const seenAnswers = new Set();
-                    
-                    for (let input of radioInputs) {
-                        const label = document.querySelector(`label[for="${input.id}"]`);
-                        
-                        if (label) {
-                            const possibleAnswer = label.querySelector('.lrn-possible-answer');
-                            
-                            if (possibleAnswer) {
-                                const contentWrappers = possibleAnswer.querySelectorAll('.lrn_contentWrapper');
-                                
-                                for (let wrapper of contentWrappers) {
-                                    if (wrapper.closest('.sr-only')) {
-                                        continue;
-                                    }
-                                    
-                                    const p = wrapper.querySelector('p');
-                                    if (p) {
-                                        const text = (p.innerText || p.textContent || '').trim();
-                                        
-                                        if (text.length > 2 && !seenAnswers.has(text) && !/^[A-E]$/.test(text)) {
-                                            seenAnswers.add(text);
-                                            result.answers.push(text);
-                                            break;
-                                        }
-                                    }
-                                }
-                            }
-                        }
+                    if (now - start >= timeout * 1000) {
+                        return done(false);
                     }
-                    
-                    result.answers = result.answers.slice(0, 5);
-                    result.debug.answerCount = result.answers.length;
-                    result.debug.questionLength = result.question.length;
-                    
-                    // Try to find question number
-                    const questionNumElement = activeContainer.querySelector('.item-number');
-                    if (questionNumElement) {
-                        const numText = questionNumElement.innerText.trim();
-                        if (numText && !isNaN(numText)) {
-                            result.debug.currentQuestion = parseInt(numText);
-                        }
-                    }
-                } else {
-                    result.debug.error = "No active container found";
-                    // Debug: log all containers for analysis
-                    result.debug.allContainers = Array.from(allQuestionContainers).map(container => {
-                        const style = window.getComputedStyle(container);
-                        const rect = container.getBoundingClientRect();
-                        return {
-                            classes: container.className,
-                            display: style.display,
-                            visibility: style.visibility,
-                            opacity: style.opacity,
-                            size: `${rect.width}x${rect.height}`,
-                            position: `top: ${rect.top}`,
-                            hasStimulus: !!container.querySelector('.lrn_stimulus_content'),
-                            hasRadio: !!container.querySelector('input[type="radio"]')
-                        };
-                    });
-                }
-                
-                return result;
-            }
-            
-            return extractCurrentQuestionData();
-            """
-            
-            data = self.driver.execute_script(script)
+                    setTimeout(check, 50);
+                })();
+            """, timeout, quiet_ms, quiet_timeout)
+        except WebDriverException:
+            # Script timed out or the document was replaced mid-wait
+            return False
+    
+    def extract_question_and_answers(self):
+        """
+        Extract ONLY the currently visible question and answers
+        
+        On failure returns None and leaves the reason in self.last_error.
+        """
+        self.last_error = None
+        try:
+            # Only the installed function is invoked, straight through CDP
+            # (no WebDriver script wrapping); re-install if missing
+            data = self.driver.execute_cdp_cmd('Runtime.evaluate', {
+                'expression': "window.__extractQuestionData ? "
+                              f"window.__extractQuestionData({'true' if DEBUG else 'false'}) : null",
+                'returnByValue': True
+            })['result'].get('value')
+            if data is None:
+                data = self.driver.execute_script(
+                    f"window.__extractQuestionData = {EXTRACT_QUESTION_JS}; "
+                    "return window.__extractQuestionData(arguments[0]);",
+                    DEBUG
+                )
             
             # Debug output
-            print(f"   [DEBUG] Total containers: {data['debug'].get('totalContainers', 0)}")
-            print(f"   [DEBUG] Container found: {data['debug'].get('containerFound', False)}")
-            print(f"   [DEBUG] Current question: {data['debug'].get('currentQuestion', 'Unknown')}")
-            print(f"   [DEBUG] Stimulus: {data['debug'].get('foundStimulus', False)}")
-            print(f"   [DEBUG] Radio inputs: {data['debug'].get('foundInputs', 0)}")
-            print(f"   [DEBUG] Answers: {data['debug'].get('answerCount', 0)}")
-            print(f"   [DEBUG] Q length: {data['debug'].get('questionLength', 0)}")
+            if DEBUG:
+                print(f"   [DEBUG] Total containers: {data['debug'].get('totalContainers', 0)}")
+                print(f"   [DEBUG] Container found: {data['debug'].get('containerFound', False)}")
+                print(f"   [DEBUG] Current question: {data['debug'].get('currentQuestion', 'Unknown')}")
+                print(f"   [DEBUG] Stimulus: {data['debug'].get('foundStimulus', False)}")
+                print(f"   [DEBUG] Radio inputs: {data['debug'].get('foundInputs', 0)}")
+                print(f"   [DEBUG] Answers: {data['debug'].get('answerCount', 0)}")
+                print(f"   [DEBUG] Q length: {data['debug'].get('questionLength', 0)}")
             
-            if 'error' in data['debug']:
+            if 'error' in data['debug'] and (VERBOSE or DEBUG):
                 print(f"   ❌ {data['debug']['error']}")
                 # Log detailed container info for debugging
                 if 'allContainers' in data['debug']:
@@ -238,110 +508,226 @@ class APClassroomOCR:
                     for i, container in enumerate(data['debug']['allContainers'][:5]):  # Show first 5
                         print(f"     Container {i}: {container}")
             
-            # Validate data with more lenient criteria
-            if not data['question'] or len(data['question']) < 10:  # Reduced from 20 to 10
-                print(f"   ❌ Question too short or missing")
-                return None
-                
-            if not data['answers'] or len(data['answers']) < 2:
-                print(f"   ❌ Need at least 2 answers (found {len(data['answers'])})")
+            # Validation runs in the extractor (question >= 10 chars, >= 2 answers)
+            if not data.get('ok'):
+                self.last_error = data['debug'].get('error') or data['reason']
                 return None
             
-            # Format output
-            question_num = data['debug'].get('currentQuestion', 'Unknown')
-            formatted = f"{data['question']}\n\n"
-            
-            # Add answers with letters
-            letters = ['A', 'B', 'C', 'D', 'E']
-            for idx, ans in enumerate(data['answers'][:5]):
-                formatted += f"{letters[idx]}. {ans}\n"
-            
-            return formatted
+            # Format output; the extractor already lettered answers A-E
+            answers = "\n".join(
+                f"{ans['letter']}. {ans['text']}" for ans in data['answers']
+            )
+            return f"{data['question']}\n\n{answers}\n"
             
         except Exception as e:
-            print(f"  ⚠ Extraction error: {e}")
-            import traceback
-            traceback.print_exc()
+            self.last_error = f"extraction error: {e}"
+            if DEBUG:
+                import traceback
+                traceback.print_exc()
             return None
     
+    def _poll_until(self, predicate, timeout, step=0.05):
+        """Poll predicate every step seconds, False if timeout expires first"""
+        try:
+            WebDriverWait(self.driver, timeout, poll_frequency=step).until(
+                lambda d: predicate()
+            )
+            return True
+        except TimeoutException:
+            return False
+    
+    def arm_content_watch(self):
+        """Install a MutationObserver that flags the next DOM change
+        
+        Returns the visible stimulus element and its text, so the caller
+        can tell when that question has been replaced.
+        """
+        return self.driver.execute_script("""
+            if (!window.__content_observer__) {
+                window.__content_observer__ = new MutationObserver(() => {
+                    window.__content_dirty__ = true;
+                });
+                window.__content_observer__.observe(document.body, {
+                    childList: true, subtree: true, characterData: true
+                });
+            }
+            window.__content_dirty__ = false;
+            // Keep room in the timing buffer for the next question's requests
+            performance.clearResourceTimings();
+            
+            for (const stimulus of document.querySelectorAll('.lrn_stimulus_content')) {
+                const rect = stimulus.getBoundingClientRect();
+                if (rect.width > 0 && rect.height > 0 && rect.top >= 0 && rect.top < window.innerHeight) {
+                    return [stimulus, stimulus.textContent];
+                }
+            }
+            return [null, null];
+        """)
+    
+    def wait_for_content_change(self, timeout, old_stimulus=None, old_text=None):
+        """Wait until the page has re-rendered, False if timeout expires first"""
+        def replaced():
+            # A fresh document has no flag at all, which also counts as changed
+            try:
+                return self.driver.execute_script("""
+                    const old = arguments[0];
+                    if (document.readyState === 'loading' || window.__content_dirty__ === false) {
+                        return false;
+                    }
+                    if (!old || !old.isConnected || old.textContent !== arguments[1]) {
+                        return true;
+                    }
+                    const rect = old.getBoundingClientRect();
+                    return rect.height === 0 || rect.top < 0 || rect.top >= window.innerHeight;
+                """, old_stimulus, old_text)
+            except StaleElementReferenceException:
+                return True
+            except WebDriverException:
+                # Document is mid-replacement; try again on the next poll
+                return False
+        
+        return self._poll_until(replaced, timeout)
+    
+    def click_next(self, wait_time, attempts=3):
+        """Click Next, re-locating the button if the page re-rendered it"""
+        old_stimulus, old_text = self.arm_content_watch()
+        
+        for attempt in range(attempts):
+            next_btn = self._next_wait.until(
+                EC.element_to_be_clickable(self._next_locator)
+            )
+            try:
+                next_btn.click()
+                break
+            except StaleElementReferenceException:
+                if attempt == attempts - 1:
+                    raise
+        
+        # Continue as soon as the question re-renders instead of a fixed sleep.
+        # Re-reading too early would save the old question again and the
+        # next click would skip one, so a slow render gets a longer grace.
+        if self.wait_for_content_change(wait_time, old_stimulus, old_text):
+            return
+        print(f"   ⏳ Next question not shown after {wait_time}s - still waiting...")
+        if not self.wait_for_content_change(SLOW_RENDER_TIMEOUT, old_stimulus, old_text):
+            raise TimeoutException(
+                f"next question did not render within {wait_time + SLOW_RENDER_TIMEOUT}s"
+            )
+    
     def run_automation(self, max_clicks, wait_time, output_folder):
         """Main automation loop"""
         
         # Create output folder
         os.makedirs(output_folder, exist_ok=True)
         
-        selector_map = {
-            'css': By.CSS_SELECTOR,
-            'xpath': By.XPATH,
-            'id': By.ID,
-            'class': By.CLASS_NAME,
-        }
-        by_method = selector_map.get(SELECTOR_TYPE, By.CSS_SELECTOR)
-        
         for i in range(max_clicks):
-            print(f"\n{'='*70}")
-            print(f"📝 QUESTION {i + 1}/{max_clicks}")
-            print(f"{'='*70}")
+            progress = f"[{i + 1}/{max_clicks}]"
+            if VERBOSE:
+                print(f"\n{'='*70}")
+                print(f"📝 QUESTION {i + 1}/{max_clicks}")
+                print(f"{'='*70}")
             
             # Wait for page load
             self.wait_for_load()
-            time.sleep(wait_time)
             
             # Extract content
-            print(f"   🔍 Extracting content...")
+            if VERBOSE:
+                print(f"   🔍 Extracting content...")
             extracted_text = self.extract_question_and_answers()
             
-            if extracted_text:
-                self.ocr_results.append({
-                    'question_num': i + 1,
-                    'text': extracted_text
-                })
-                print(f"   ✅ Successfully extracted!")
+            seen_at, stuck = self._is_repeat(extracted_text, i + 1)
+            if stuck:
+                print(f"{progress} ⚠ Same as previous question - Next did not advance")
+                self._write_result(i + 1, f"[Question {i + 1} - Same as Previous Question]\n\n")
+                self.failed.append(i + 1)
+            elif seen_at:
+                print(f"{progress} ⚠ Same as question {seen_at} - Next wrapped around")
+                self._write_result(i + 1, f"[Question {i + 1} - Same as Question {seen_at}]\n\n")
+                self.failed.append(i + 1)
+            elif extracted_text:
+                self._write_result(i + 1, extracted_text)
+                self.successful.append(i + 1)
                 
                 # Show preview
-                lines = extracted_text.split('\n')
-                preview = lines[0][:60] + "..." if len(lines[0]) > 60 else lines[0]
-                print(f"   📄 {preview}")
+                first_line = extracted_text.split('\n', 1)[0]
+                preview = first_line[:60] + "..." if len(first_line) > 60 else first_line
+                print(f"{progress} ✅ {preview}")
             else:
-                print(f"   ❌ Extraction failed")
-                self.ocr_results.append({
-                    'question_num': i + 1,
-                    'text': f"[Question {i + 1} - Extraction Failed]\n\n"
-                })
+                print(f"{progress} ❌ Extraction failed: {self.last_error}")
+                self._write_result(i + 1, f"[Question {i + 1} - Extraction Failed]\n\n")
+                self.failed.append(i + 1)
             
             # Click next
             if i < max_clicks - 1:
                 try:
-                    print(f"   ⏭  Clicking Next...")
-                    next_btn = WebDriverWait(self.driver, 5).until(
-                        EC.element_to_be_clickable((by_method, BUTTON_SELECTOR))
-                    )
-                    next_btn.click()
-                    time.sleep(2)
-                    print(f"   ✓ Next question loaded")
+                    if VERBOSE:
+                        print(f"   ⏭  Clicking Next...")
+                    self.click_next(wait_time)
+                    if VERBOSE:
+                        print(f"   ✓ Next question loaded")
                 except Exception as e:
                     print(f"   ⚠ Cannot click Next: {e}")
                     print(f"   Stopping...")
                     break
     
-    def save_results(self, output_file):
-        """Save results in clean format"""
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write("=" * 80 + "\n")
-            f.write("AP CLASSROOM - QUESTIONS & ANSWERS\n")
-            f.write("=" * 80 + "\n\n")
-            
-            for result in self.ocr_results:
-                f.write(f"QUESTION {result['question_num']}\n")
-                f.write("-" * 80 + "\n")
-                f.write(result['text'])
-                f.write("\n")
+    def _is_repeat(self, text, question_num, window=64):
+        """Check text against recently saved questions
         
-        print(f"\n💾 Saved: {output_file}")
+        Returns (question it was first saved under or None, whether it is
+        the same as the question read just before).
+        """
+        if not text:
+            # A failed read breaks the run of identical questions
+            self._last_hash = None
+            return None, False
+        
+        text_hash = hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest()
+        stuck = text_hash == self._last_hash
+        self._last_hash = text_hash
+        
+        seen_at = self._recent_hashes.get(text_hash)
+        if seen_at is not None:
+            # Keep pointing at the block that holds the text
+            self._recent_hashes.move_to_end(text_hash)
+            return seen_at, stuck
+        
+        self._recent_hashes[text_hash] = question_num
+        if len(self._recent_hashes) > window:
+            self._recent_hashes.popitem(last=False)
+        return None, stuck
+    
+    def _write_result(self, question_num, text):
+        """Append one question block to the results file"""
+        if not self.results_file:
+            return
+        if not self._results_fh:
+            self._results_fh = open(self.results_file, 'w', encoding='utf-8', buffering=1 << 16)
+            self._results_fh.write(
+                f"{'=' * 80}\nAP CLASSROOM - QUESTIONS & ANSWERS\n{'=' * 80}\n\n"
+            )
+        
+        # One write per block keeps the text layer out of the loop
+        self._results_fh.write(f"QUESTION {question_num}\n{'-' * 80}\n{text}\n")
+        # Flush per question so a killed run keeps everything so far
+        self._results_fh.flush()
+    
+    def save_results(self):
+        """Flush and close the results file"""
+        if self._results_fh:
+            self._results_fh.close()
+            self._results_fh = None
+            print(f"\n💾 Saved: {self.results_file}")
     
     def cleanup(self):
-        """Close browser"""
-        self.driver.quit()
+        """Close browser and results file"""
+        if self._results_fh:
+            self._results_fh.close()
+            self._results_fh = None
+        if self.reuse_browser:
+            # Leave Chrome running for the next run to attach to
+            self.driver.service.stop()
+        else:
+            self.driver.quit()
 
 
 def main():
@@ -349,41 +735,59 @@ def main():
     print("AP CLASSROOM EXTRACTOR - FIXED VERSION")
     print("=" * 80)
     
-    ocr = APClassroomOCR(tesseract_path=TESSERACT_PATH)
+    if REUSE_BROWSER and HEADLESS:
+        # A detached headless Chrome would keep the profile locked with no
+        # window to close it from
+        print("\n❌ REUSE_BROWSER cannot be combined with HEADLESS.")
+        return
+    
+    ocr = APClassroomOCR(
+        results_file=OCR_RESULTS_FILE,
+        profile_dir=CHROME_PROFILE,
+        headless=HEADLESS,
+        block_images=BLOCK_IMAGES,
+        reuse_browser=REUSE_BROWSER
+    )
     
     try:
         print(f"\n🌐 Opening: {WEBSITE_URL}")
         ocr.navigate_to_url(WEBSITE_URL)
         
-        # Pause for login
-        print("\n" + "=" * 80)
-        print("⚠️  SETUP:")
-        print("    1. Log in to AP Classroom")
-        print("    2. Go to the FIRST question")
-        print("    3. Wait for it to fully load")
-        print("    4. Press ENTER to start")
-        print("=" * 80)
-        input()
+        # Pause for login unless the saved profile is still signed in
+        if ocr.is_logged_in():
+            print("\n✓ Session restored - skipping login")
+        elif HEADLESS:
+            print("\n❌ Not logged in. Run once with HEADLESS = False to log in.")
+            return
+        else:
+            print("\n" + "=" * 80)
+            print("⚠️  SETUP:")
+            print("    1. Log in to AP Classroom")
+            print("    2. Go to the FIRST question")
+            print("    3. Wait for it to fully load")
+            print("    4. Press ENTER to start")
+            print("=" * 80)
+            input()
         
         print(f"\n▶  Starting...")
         print(f"    Questions: {MAX_CLICKS}")
-        print(f"    Wait: {WAIT_TIME}s\n")
+        print(f"    Wait: up to {WAIT_TIME}s per question\n")
         
         # Run automation
         ocr.run_automation(MAX_CLICKS, WAIT_TIME, OUTPUT_FOLDER)
         
         # Save results
-        ocr.save_results(OCR_RESULTS_FILE)
+        ocr.save_results()
         
         # Summary
-        successful = len([r for r in ocr.ocr_results if not r['text'].startswith('[Question')])
-        failed = len(ocr.ocr_results) - successful
+        successful = len(ocr.successful)
+        failed = len(ocr.failed)
         
         print("\n" + "=" * 80)
         print("✅ DONE!")
         print("=" * 80)
         print(f"📄 File: {OCR_RESULTS_FILE}")
-        print(f"✓ Success: {successful}/{len(ocr.ocr_results)}")
+        print(f"✓ Success: {successful}/{successful + failed}")
         if failed > 0:
             print(f"⚠ Failed: {failed}")
         print("=" * 80)
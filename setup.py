@@ -1,6 +1,3 @@
-import os
-import platform
-
 def setup_config():
     """Interactive setup wizard for AP Classroom automation"""
     
@@ -22,21 +19,7 @@ def setup_config():
     
     # Wait time
     print("\n--- Speed Settings ---")
-    wait_time = input("Seconds to wait between questions? [3]: ").strip() or "3"
-    
-    # Tesseract path detection
-    print("\n--- Tesseract OCR Detection ---")
-    tesseract_path = None
-    
-    if platform.system() == 'Windows':
-        default_path = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
-        if os.path.exists(default_path):
-            print(f"✓ Found Tesseract at: {default_path}")
-            tesseract_path = default_path
-        else:
-            custom_path = input("Enter Tesseract path (or press Enter to skip): ").strip()
-            if custom_path and os.path.exists(custom_path):
-                tesseract_path = custom_path
+    wait_time = input("Max seconds to wait for each next question to load? [3]: ").strip() or "3"
     
     # Auto-configure for AP Classroom
     button_selector = "[data-test-id='next-button']"
@@ -44,24 +27,16 @@ def setup_config():
     output_folder = "os.path.join(os.path.expanduser('~'), 'Documents', 'APClassroom_Screenshots')"
     ocr_results_file = "os.path.join(os.path.expanduser('~'), 'Documents', 'APClassroom_Results.txt')"
     
-    # Format tesseract path
-    if tesseract_path:
-        tesseract_repr = f'r"{tesseract_path}"'
-    else:
-        tesseract_repr = "None"
-    
     # Summary
     print("\n" + "=" * 60)
     print("  Configuration Summary")
     print("=" * 60)
     print(f"Website:          {website_url}")
     print(f"Questions:        {max_clicks}")
-    print(f"Wait Time:        {wait_time} seconds")
+    print(f"Wait Time:        up to {wait_time} seconds")
     print(f"Button:           Next (auto-configured)")
     print(f"Output Folder:    Documents/APClassroom_Screenshots/")
     print(f"Results File:     Documents/APClassroom_Results.txt")
-    if tesseract_path:
-        print(f"Tesseract:        {tesseract_path}")
     print("=" * 60)
     
     confirm = input("\nCreate config.py with these settings? [Y/n]: ").strip().lower()
@@ -86,8 +61,18 @@ SELECTOR_TYPE = "{selector_type}"
 MAX_CLICKS = {max_clicks}
 WAIT_TIME = {wait_time}
 
-# Tesseract OCR path
-TESSERACT_PATH = {tesseract_repr}
+# Chrome profile (keeps you logged in between runs)
+CHROME_PROFILE = os.path.join(os.path.expanduser('~'), '.apclassroom_chrome_profile')
+
+# Run Chrome without a window (set True after logging in once)
+HEADLESS = False
+
+# Skip loading images and video (only text is extracted)
+BLOCK_IMAGES = True
+
+# Leave Chrome open after a run and reuse it next time (skips startup).
+# Not with HEADLESS; close the Chrome window to stop it.
+REUSE_BROWSER = False
 
 # Output settings (Saved to Documents folder)
 OUTPUT_FOLDER = {output_folder}
@@ -101,8 +86,7 @@ OCR_RESULTS_FILE = {ocr_results_file}
         print("\n✓ Configuration saved to config.py")
         print("\n" + "=" * 60)
         print("Next steps:")
-        print("  1. Make sure Tesseract OCR is installed")
-        print("  2. Run: python screenshot_automation.py")
+        print("  1. Run: python screenshot_automation.py")
         print("=" * 60)
         
     except Exception as e: